@@ -0,0 +1,42 @@
+"""Memory held per parsed command, with and without the compact mode of the commands.
+
+The program (test.cnc by default) is repeated to reach a significant size, then read and parsed under tracemalloc.
+The memory still allocated once parsed (content and commands) is divided by the number of commands.
+"""
+
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from cnc_snapmaker_post_process.files import SnapmakerFile
+
+PROGRAM = Path(__file__).resolve().parent.parent / "test.cnc"
+REPEAT = 100
+
+
+def measure(path: Path, compact: bool):
+    tracemalloc.start()
+    file = SnapmakerFile(path, compact=compact, quiet=True).read_content().parse_commands()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(file.commands), current, peak
+
+
+def main():
+    program = Path(sys.argv[1]) if len(sys.argv) > 1 else PROGRAM
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / program.name
+        path.write_text(program.read_text() * REPEAT)
+        # patterns are compiled on first use, keep them out of the measures
+        SnapmakerFile(program, quiet=True).read_content().parse_commands()
+        for compact in (False, True):
+            commands, current, peak = measure(path, compact)
+            print(
+                f"compact={compact!s:<5} : {commands} commands, {current / commands:.0f} bytes per command "
+                f"(peak {peak / 2**20:.1f} MiB)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Startup time of `snaprocess -q` on a small program without arcs, checked against its target.
+
+This is the cost paid by scripts calling the CLI on many small files. Each run imports the package and processes the
+program through `run()` in a fresh interpreter, so nothing is cached in `sys.modules`. Exits with an error if the
+median time exceeds the target, or if the run pulled in rich or numpy.
+"""
+
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from statistics import median
+
+TARGET = 0.050
+RUNS = 7
+
+PROGRAM = ["G90", "G21", "G0 X0 Y0 Z5", "M3 P100", "G1 Z-1 F100", "G1 X10 Y10", "G0 Z5", "M5"]
+
+MEASURE = """
+import sys, time
+start = time.perf_counter()
+from cnc_snapmaker_post_process import run
+sys.argv = ["snaprocess", "-q", "-f", sys.argv[1]]
+run()
+elapsed = time.perf_counter() - start
+heavy = {"rich", "numpy"} & set(sys.modules)
+assert not heavy, f"the run imported {sorted(heavy)}"
+print(elapsed)
+"""
+
+
+def measure(path: Path) -> float:
+    result = subprocess.run([sys.executable, "-c", MEASURE, str(path)], capture_output=True, text=True)
+    if result.returncode:
+        sys.exit(result.stderr.strip())
+    return float(result.stdout)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "program.cnc"
+        path.write_text("\n".join(PROGRAM) + "\n")
+        elapsed = median(measure(path) for _ in range(RUNS))
+    print(f"snaprocess -q on {len(PROGRAM)} lines : {elapsed * 1000:.1f} ms (target {TARGET * 1000:.0f} ms)")
+    if elapsed > TARGET:
+        sys.exit(f"startup time exceeds the target of {TARGET * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
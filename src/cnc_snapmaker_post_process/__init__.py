@@ -1,12 +1,46 @@
+import sys
 from argparse import ArgumentParser
+from importlib import import_module
+from math import sqrt
 from pathlib import Path
 
-from . import files, transformations, patterning
-from .files import File
-from .transformations import TransformationRuleSet
-from .patterning import Patterner
-
-from typing import Type
+from typing import Type, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .files import File
+    from .transformations import TransformationRuleSet
+    from .patterning import Patterner
+    from .validation import ToolpathValidator
+    from .verification import DeviationVerifier
+
+# submodules are imported on first access only : scripts don't pay for rich or numpy unless they use them
+SUBMODULES = [
+    "exceptions",
+    "files",
+    "gcode",
+    "memories",
+    "patterning",
+    "stats",
+    "streaming",
+    "transformations",
+    "validation",
+    "verification",
+]
+LAZY_ATTRIBUTES = {
+    "File": "files",
+    "TransformationRuleSet": "transformations",
+    "Patterner": "patterning",
+    "ToolpathValidator": "validation",
+    "DeviationVerifier": "verification",
+}
+
+
+def __getattr__(name: str):
+    if name in SUBMODULES:
+        return import_module(f".{name}", __name__)
+    if name in LAZY_ATTRIBUTES:
+        return getattr(import_module(f".{LAZY_ATTRIBUTES[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # from rich import traceback
 # traceback.install(show_locals=True)
@@ -17,28 +51,132 @@ def run():
     parser = ArgumentParser()
     parser.add_argument("-f", "--file", help="path of the file to process", required=True)
     parser.add_argument("-m", "--machine", help="Machine gcode set to use", default="snapmaker")
+    parser.add_argument(
+        "--skip-validation", help="do not validate the toolpath before transforming it", action="store_true"
+    )
+    parser.add_argument(
+        "--validate",
+        help="validate programs without arcs too (by default, only when arcs or validation options are given)",
+        action="store_true",
+    )
+    parser.add_argument("--safe-z", help="lowest Z allowed for G0 moves while the spindle is on", type=float)
+    parser.add_argument("--max-plunge-feed", help="highest feed allowed for Z-down moves", type=float)
+    for axis in "XYZ":
+        parser.add_argument(
+            f"--{axis.lower()}-limits", help=f"work envelope along {axis}", nargs=2, type=float, metavar=("MIN", "MAX")
+        )
+    parser.add_argument(
+        "--skip-verification", help="do not measure the deviation of the transformed output", action="store_true"
+    )
+    parser.add_argument("-t", "--tolerance", help="maximal deviation allowed for the transformed output", type=float)
+    parser.add_argument(
+        "-c", "--compact", help="keep only the original lines that can't be generated back", action="store_true"
+    )
+    parser.add_argument("-q", "--quiet", help="do not print reports", action="store_true")
 
     args = parser.parse_args()
 
+    from . import files, transformations
+
     path = Path(args.file).resolve()
     machine_name = str(args.machine).capitalize()
 
-    machine_file_class: Type[File] = getattr(files, machine_name + "File")
-    transformation_class: Type[TransformationRuleSet] = getattr(transformations, machine_name + "Transformation")
+    machine_file_class: "Type[File]" = getattr(files, machine_name + "File")
+    transformation_class: "Type[TransformationRuleSet]" = getattr(transformations, machine_name + "Transformation")
 
     root, filename, extension = path.parent, Path(path).stem, Path(path).suffix
 
     output_path = root / f"{filename}-transformed{extension}"
 
-    file = machine_file_class(path)
-    file = (
-        file.read_content()
-        .parse_commands()
-        .to_tranformer(transformation_class)
-        .transform()
-        .to_file(output_path)
-        .write_content()
-    )
+    file = machine_file_class(path, compact=args.compact, quiet=args.quiet)
+    file = file.read_content().parse_commands()
+
+    # the array stages need numpy (~70 ms to import) : programs without arcs don't load it unless asked to
+    from .gcode import ArcMove, LinearMove
+
+    has_arcs = any(isinstance(command, ArcMove) for command in file.commands)
+    limits = {axis: tuple(bounds) for axis in "XYZ" if (bounds := getattr(args, f"{axis.lower()}_limits"))}
+    validation_asked = args.validate or limits or args.safe_z is not None or args.max_plunge_feed is not None
+
+    if not args.skip_validation and (has_arcs or validation_asked):
+        from . import validation
+
+        validator_class: "Type[ToolpathValidator]" = getattr(validation, machine_name + "Validator")
+        file.to_validator(
+            validator_class, limits=limits, safe_z=args.safe_z, max_plunge_feed=args.max_plunge_feed
+        ).validate()
+
+    transformer = file.to_tranformer(transformation_class).transform()
+    transformed = transformer.to_file(output_path).write_content()
+
+    # when no rule applied, the output only differs by the rounding of the rewritten lines
+    rounding = sqrt(3) / 2 * 10**-LinearMove.decimals
+    within_rounding = not transformer.matched and (args.tolerance is None or args.tolerance >= rounding)
+
+    if not args.skip_verification and not within_rounding:
+        from . import verification
+
+        verifier_class: "Type[DeviationVerifier]" = getattr(verification, machine_name + "Verifier")
+        file.to_verifier(verifier_class, transformed, tolerance=args.tolerance).verify()
+
+
+def verify():
+
+    parser = ArgumentParser()
+    parser.add_argument("-f", "--file", help="path of the original file", required=True)
+    parser.add_argument("-o", "--output", help="path of the transformed file (defaults to <file>-transformed)")
+    parser.add_argument("-m", "--machine", help="Machine gcode set to use", default="snapmaker")
+    parser.add_argument("-t", "--tolerance", help="maximal deviation allowed for the transformed output", type=float)
+    parser.add_argument("-q", "--quiet", help="do not print reports", action="store_true")
+
+    args = parser.parse_args()
+
+    from . import files, verification
+
+    path = Path(args.file).resolve()
+    machine_name = str(args.machine).capitalize()
+
+    machine_file_class: "Type[File]" = getattr(files, machine_name + "File")
+    verifier_class: "Type[DeviationVerifier]" = getattr(verification, machine_name + "Verifier")
+
+    root, filename, extension = path.parent, Path(path).stem, Path(path).suffix
+
+    output_path = Path(args.output) if args.output else root / f"{filename}-transformed{extension}"
+
+    file = machine_file_class(path, quiet=args.quiet).read_content().parse_commands()
+    transformed = machine_file_class(output_path, quiet=args.quiet).read_content()
+    file.to_verifier(verifier_class, transformed, tolerance=args.tolerance).verify()
+
+
+def stream():
+
+    parser = ArgumentParser(description="Transforms G-code read from stdin (or a local socket) and writes it to stdout")
+    parser.add_argument("-m", "--machine", help="Machine gcode set to use", default="snapmaker")
+    parser.add_argument("-s", "--socket", help="path of a local unix socket to read from instead of stdin")
+    parser.add_argument("-l", "--max-latency", help="maximal delay in seconds before a line is written", type=float)
+    parser.add_argument("-b", "--batch-size", help="number of lines written at once when input is fast", type=int)
+    parser.add_argument("-q", "--quiet", help="do not print reports", action="store_true")
+
+    args = parser.parse_args()
+
+    from . import files, transformations, streaming
+
+    machine_name = str(args.machine).capitalize()
+
+    machine_file_class: "Type[File]" = getattr(files, machine_name + "File")
+    transformation_class: "Type[TransformationRuleSet]" = getattr(transformations, machine_name + "Transformation")
+
+    input = streaming.open_socket_stream(args.socket) if args.socket else sys.stdin
+
+    streaming.StreamFilter(
+        machine_file_class,
+        transformation_class,
+        input,
+        sys.stdout,
+        max_latency=args.max_latency,
+        batch_size=args.batch_size,
+        quiet=args.quiet,
+    ).run()
 
 
 def inject():
@@ -47,21 +185,24 @@ def inject():
     parser.add_argument("-f", "--file", help="path of the file to process", required=True)
     parser.add_argument("-m", "--machine", help="Machine gcode set to use", default="snapmaker")
     parser.add_argument("-p", "--patterner", help="Patterner class name", default="Patterner")
+    parser.add_argument("-q", "--quiet", help="do not print reports", action="store_true")
 
     args = parser.parse_args()
 
+    from . import files, patterning
+
     path = Path(args.file).resolve()
     machine_name = str(args.machine).capitalize()
     patterner_class_name = str(args.patterner)
 
-    machine_file_class: Type[File] = getattr(files, machine_name + "File")
-    patterner_class: Type[Patterner] = getattr(patterning, patterner_class_name)
+    machine_file_class: "Type[File]" = getattr(files, machine_name + "File")
+    patterner_class: "Type[Patterner]" = getattr(patterning, patterner_class_name)
 
     root, filename, extension = path.parent, Path(path).stem, Path(path).suffix
 
     output_path = root / f"{filename}-patterned{extension}"
 
-    file = machine_file_class(path)
+    file = machine_file_class(path, quiet=args.quiet)
     file = (
         file.read_content()
         .parse_commands()
@@ -1,2 +1,24 @@
+from typing import Sequence
+
+
 class MatchException(Exception):
     pass
+
+
+class ReportException(Exception):
+    """Failure of a stage that prints a report : the first lines of the report are kept in the message, since the
+    report itself is not printed in quiet mode."""
+
+    def __init__(self, summary: str, details: Sequence[str] = (), limit: int = 10):
+        lines = [summary, *details[:limit]]
+        if len(details) > limit:
+            lines.append(f"... and {len(details) - limit} more")
+        super().__init__("\n".join(lines))
+
+
+class ValidationException(ReportException):
+    pass
+
+
+class VerificationException(ReportException):
+    pass
@@ -1,34 +1,68 @@
-from rich.console import Console, Group
-from rich.panel import Panel
-from rich.text import Text
 from pathlib import Path
 
 
 from .gcode import Command, Gcode, SnapmakerGcode
 
 
-from typing import List, Type, TYPE_CHECKING
+from typing import List, Optional, Type, TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from .transformations import TransformationRuleSet
+    from rich.console import Console
+    from .transformations import MovePath, TransformationRuleSet
     from .patterning import Patterner
+    from .validation import ToolpathValidator
+    from .verification import DeviationVerifier
 
 
 class File:
 
     gcode_class = Gcode
-    content: List[str]
     commands: List[Command]
+    # moves of the file and their source commands, when the file comes from a transformation
+    moves: "Optional[MovePath]" = None
 
-    def __init__(self, path: str | Path):
+    def __init__(self, path: str | Path, compact: bool = False, quiet: bool = False):
         self.path = path
-        self.console = Console()
+        self.compact = compact
+        self.quiet = quiet
+        self._console: "Console | None" = None
+        self._content: List[str] | None = None
+
+    @property
+    def content(self) -> List[str]:
+        if self._content is None:
+            # released once parsed in compact mode : the commands hold every line, or can generate it back
+            return [command.line for command in self.commands]
+        return self._content
+
+    @content.setter
+    def content(self, content: List[str] | None):
+        self._content = content
+
+    @property
+    def console(self) -> "Console":
+        # rich is only imported once something has to be displayed
+        if self._console is None:
+            from rich.console import Console
+
+            self._console = Console()
+        return self._console
+
+    @console.setter
+    def console(self, console: "Console"):
+        self._console = console
 
     def read_content(self):
         path = Path(self.path).resolve()
         with open(path, "r") as f:
             content = f.read()
         self.content = [line.lstrip() for line in content.splitlines()]
+        if self.quiet:
+            return self
+
+        from rich.panel import Panel
+        from rich.text import Text
+
         self.console.print(
             Panel(
                 Text().append("📄 Read content of file ", style="blue").append(f"{path}", style="light_salmon3"),
@@ -46,6 +80,12 @@ class File:
             for line in self.content:
                 f.write(line)
                 f.write("\n")
+        if self.quiet:
+            return self
+
+        from rich.panel import Panel
+        from rich.text import Text
+
         self.console.print(
             Panel(
                 Text().append("📝 Wrote content to file ", style="blue").append(f"{path}", style="light_salmon3"),
@@ -58,13 +98,22 @@ class File:
         return self
 
     def parse_commands(self) -> "File":
-        gcode = self.gcode_class()
-        commands, renders = [], []
-        for line_number, line in enumerate(self.content):
-            command = gcode.get_code(line)
-            renders.append(command.rich_render(line_number + 1))
-            commands.append(command)
+        gcode = self.gcode_class(compact=self.compact)
+        commands = [gcode.get_code(line) for line in self.content]
+        self.commands = commands
+        if not self.quiet:
+            self.print_parsing()
+        if self.compact:
+            # the commands hold (or can generate back) every line, see the content property
+            self.content = None
+        return self
 
+    def print_parsing(self):
+        from rich.console import Group
+        from rich.panel import Panel
+        from rich.text import Text
+
+        renders = [command.rich_render(line_number + 1) for line_number, command in enumerate(self.commands)]
         self.console.print(
             Panel(
                 Group(
@@ -84,12 +133,18 @@ class File:
                 highlight=True,
             )
         )
-        self.commands = commands
-        return self
 
     def to_tranformer(self, transformer_class: Type["TransformationRuleSet"]) -> "TransformationRuleSet":
         return transformer_class(self)
 
+    def to_validator(self, validator_class: "Type[ToolpathValidator]", **kwargs) -> "ToolpathValidator":
+        return validator_class(self, **kwargs)
+
+    def to_verifier(
+        self, verifier_class: "Type[DeviationVerifier]", transformed: "File", **kwargs
+    ) -> "DeviationVerifier":
+        return verifier_class(self, transformed, **kwargs)
+
     def to_patterner(self, patterner_class: "Type[Patterner]") -> "Patterner":
         return patterner_class(self)
 
@@ -103,8 +158,8 @@ class File:
         return content
 
     @classmethod
-    def from_commands(cls, path: str | Path, commands: List[Command]):
-        file = cls(path)
+    def from_commands(cls, path: str | Path, commands: List[Command], quiet: bool = False):
+        file = cls(path, quiet=quiet)
         file.commands = commands
         file.generate_content(inplace=True)
         return file
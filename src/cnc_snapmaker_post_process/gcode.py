@@ -1,8 +1,8 @@
-from rich.console import Group
-from rich.text import Text
 from .exceptions import MatchException
 from .memories import (
     SelfReturn,
+    ZeroDefault,
+    PreviousDefault,
     PreviousXDefault,
     PreviousYDefault,
     PreviousZDefault,
@@ -10,46 +10,95 @@ from .memories import (
     PreviousXStorer,
     PreviousYStorer,
     PreviousZStorer,
+    reset_memories,
 )
-from .patterning import Balise, Pattern, compile
+from .patterning import Balise, Pattern, MasterPattern, compile
 
-from typing import List, Type, get_type_hints, Dict, Any
+from typing import List, Tuple, Type, get_type_hints, Dict, Any
 
 from math import inf
 
 
+def _is_memory_type(hint) -> bool:
+    return isinstance(hint, type) and issubclass(hint, (ZeroDefault, PreviousDefault))
+
+
 class Command:
 
-    pattern: Pattern[str] | List[Pattern[str]]
-    line: str
+    # instances only hold their declared fields : subclasses declare theirs in __slots__ along with their type hints
+    __slots__ = ("_line",)
+    fields: Tuple[str, ...] = ()
+
+    pattern: Pattern | List[Pattern]
     priority = 0
     do_match = True
-    contains_a_balise = False
+    regenerates_line = False
 
     def __init__(self, line: str):
-        self.line = line
+        self._line = line
         if self.do_match:
             self._instanciate_self()
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.fields = cls.fields + tuple(slot for slot in cls.__dict__.get("__slots__", ()) if slot not in cls.fields)
+
+    @property
+    def line(self) -> str:
+        if self._line is None:
+            return self.generate_line()
+        return self._line
+
+    def release_line(self):
+        """Drops the original line when the command can generate it back from its fields (compact mode)."""
+        if self.regenerates_line and not self.contains_a_balise:
+            self._line = None
+
+    @property
+    def contains_a_balise(self) -> bool:
+        return any(getattr(self, field, None) is Balise for field in self.fields)
+
     def _instanciate_self(self):
 
         if self.line == "":
             return
 
-        reverse_class_list: List[Type[Command]] = list(reversed(type(self).mro()))
-        reverse_class_list = [cls for cls in reverse_class_list if issubclass(cls, Command) and cls != Command]
-
         attributes = {}
-        type_hints = {}
-        for cls in reverse_class_list:
+        for cls in self.command_classes():
             d = cls.match(self.line)
             if d is not None:
-                type_hints.update(get_type_hints(cls))
                 attributes.update(d)
             else:
                 raise MatchException("No match")
 
-        self.set_attributes(self.finish_attributes_dict(attributes, type_hints))
+        self.set_attributes(self.finish_attributes_dict(attributes, self.type_hints()))
+
+    @classmethod
+    def from_attributes(cls, line: str, attributes: Dict[str, str | None]) -> "Command":
+        """Instanciates a command from fields already extracted from its line (see MasterPattern)."""
+        command = cls.__new__(cls)
+        command._line = line
+        command.set_attributes(command.finish_attributes_dict(attributes, cls.type_hints()))
+        return command
+
+    @classmethod
+    def command_classes(cls) -> "List[Type[Command]]":
+        return [klass for klass in reversed(cls.mro()) if issubclass(klass, Command) and klass is not Command]
+
+    @classmethod
+    def patterns(cls) -> List[Pattern]:
+        """Every pattern a line must contain to be this command, the ones of its parent classes first."""
+        patterns = []
+        for klass in cls.command_classes():
+            if hasattr(klass, "pattern"):
+                patterns.extend(klass.pattern if isinstance(klass.pattern, list) else [klass.pattern])
+        return patterns
+
+    @classmethod
+    def type_hints(cls) -> Dict[str, Type]:
+        if "_type_hints" not in cls.__dict__:
+            cls._type_hints = get_type_hints(cls)
+        return cls._type_hints
 
     def set_attributes(self, dict: dict):
         for key, value in dict.items():
@@ -82,11 +131,14 @@ class Command:
         return {k: self.instanciate_attribute(v, type_hints.get(k)) for k, v in attributes.items()}
 
     def instanciate_attribute(self, attribute_value_string: str | None, attribute_hint: Type | None):
+        if attribute_value_string is None and _is_memory_type(attribute_hint):
+            # omitted words (ex : Y in "G1 X2") fall back to their modal value
+            return attribute_hint(None)
+
         if not isinstance(attribute_value_string, str):
             return attribute_value_string
 
         if attribute_value_string.startswith("{") and attribute_value_string.endswith("}"):
-            self.contains_a_balise = True
             return Balise
 
         if attribute_hint is None:
@@ -96,19 +148,27 @@ class Command:
 
     @classmethod
     def manual_instanciation(cls, **dict_attributes):
+        """Instance built from its fields directly. Only declared fields can be given, commands have no __dict__."""
 
-        obj = cls("")
-        obj.set_attributes(dict_attributes)
+        # nothing to match in a manual instance, skip __init__
+        obj = cls.__new__(cls)
+        obj._line = ""
+        try:
+            obj.set_attributes(dict_attributes)
+        except AttributeError as error:
+            undeclared = [name for name in dict_attributes if name not in cls.fields]
+            raise TypeError(f"{cls.__name__} has no field {undeclared}, its fields are {list(cls.fields)}") from error
         return obj
 
     def __str__(self):
-        values = [f"{key}={value}" for key, value in self.__dict__.items() if key != "line"]
+        values = [f"{key}={getattr(self, key)}" for key in self.fields if hasattr(self, key)]
         return f"<{type(self).__name__}> " + ", ".join(values)
 
     def __repr__(self):
         return str(self)
 
     def rich_render(self, line_number: int, verbose=False):
+        from rich.text import Text
 
         if self.line == "":
             if not verbose:
@@ -127,10 +187,12 @@ class Command:
 
 
 class UnidentifiedCommand(Command):
+    __slots__ = ()
     do_match = False
 
 
 class EmptyCommand(Command):
+    __slots__ = ()
     do_match = False
 
     def __init__(self):
@@ -138,32 +200,40 @@ class EmptyCommand(Command):
 
 
 class CommentLine(Command):
+    __slots__ = ()
     pattern = compile(r"^#.*$")
     priority = inf
 
 
 class UnitsCommand(Command):
+    __slots__ = ()
     pattern = compile("G(?:20)|(?:21)")
 
 
 class MetricCommand(UnitsCommand):
+    __slots__ = ()
     pattern = compile("G21")
 
 
 class ImperialCommand(UnitsCommand):
+    __slots__ = ()
     pattern = compile("G20")
 
 
 class SpindleCommand(Command):
     """Just a base class for all spindle related commands"""
 
+    __slots__ = ()
+
 
 class StopSpindleCommand(SpindleCommand):
+    __slots__ = ()
 
     pattern = compile("M5")
 
 
 class StartSpindleCommand(SpindleCommand):
+    __slots__ = ("P",)
 
     pattern = compile(r"M3 +P(?P<P>\d+)")
     P: int
@@ -172,20 +242,26 @@ class StartSpindleCommand(SpindleCommand):
 class MoveModeCommand(Command):
     """Just a base class for all move related commands"""
 
+    __slots__ = ()
+
 
 class AbsoluteCommand(MoveModeCommand):
+    __slots__ = ()
     pattern = compile("G90")
 
 
 class RelativeCommand(MoveModeCommand):
+    __slots__ = ()
     pattern = compile("G91")
 
 
 class MoveCommand(Command):
+    __slots__ = ("G", "X", "Y", "Z", "F", "start_X", "start_Y", "start_Z")
 
-    pattern = compile(
-        r"G(?P<G>\d) +(?:X(?P<X>[\d.-]+))? *(?:Y(?P<Y>[\d.-]+))? *(?:Z(?P<Z>[\d.-]+))? *(?:F(?P<F>[\d.-]+))?"
-    )
+    # one optional pattern per word, each searched through the whole line : words may come in any order
+    pattern = [compile(r"G(?P<G>\d) +")] + [
+        compile(rf"(?:.*?{word}(?P<{word}>[\d.-]+))?") for word in ("X", "Y", "Z", "F")
+    ]
     G: int
     X: PreviousXDefault
     Y: PreviousYDefault
@@ -205,42 +281,64 @@ class MoveCommand(Command):
 
 
 class LinearMove(MoveCommand):
+    __slots__ = ()
 
     pattern = compile(r"G[01]")
+    regenerates_line = True
+    decimals = 2
 
     def generate_line(self):
         F = f" F{self.F:.0f}" if self.G == 1 else ""
-        return f"G{self.G} X{self.X:.2f} Y{self.Y:.2f} Z{self.Z:.2f}{F}"
+        d = self.decimals
+        return f"G{self.G} X{self.X:.{d}f} Y{self.Y:.{d}f} Z{self.Z:.{d}f}{F}"
 
 
 class ArcMove(MoveCommand):
+    __slots__ = ("R",)
+
+    # how much longer than the diameter the chord between the endpoints may be (rounding in CAM exports)
+    radius_tolerance = 1e-3
 
     pattern = [compile(r"G[23]"), compile(r"(?:R(?P<R>[\d.-]+))")]
     R: float
+    regenerates_line = True
+
+    def generate_line(self):
+        # unlike linear moves, arcs are not rounded : the shortest repr gives back the exact parsed values
+        return f"G{self.G} X{self.X!r} Y{self.Y!r} Z{self.Z!r} R{self.R!r} F{self.F!r}"
 
 
 class Gcode:
 
     command_set: List[Type[Command]]
 
+    def __init__(self, compact: bool = False):
+        self.compact = compact
+        # modal values are remembered across lines, a new program starts back from the origin
+        reset_memories()
+
     def get_code(self, line: str) -> Command:
+        command = self.identify(line)
+        if self.compact:
+            command.release_line()
+        return command
+
+    def identify(self, line: str) -> Command:
         if line == "":
             return EmptyCommand()
 
-        code_lookups = self.command_set
-        codes = [v for v in [command.parse_line(line) for command in code_lookups] if v is not None]
-
-        if len(codes) == 0:
+        identified = self.master_pattern().match(line)
+        if identified is None:
             return UnidentifiedCommand(line)
-        elif len(codes) > 1:
-            max_priority_found = max([code.priority for code in codes])
+        command_class, attributes = identified
+        return command_class.from_attributes(line, attributes)
 
-            filtered_codes = list(filter(lambda code: code.priority >= max_priority_found, codes))
-            if len(filtered_codes) > 1:
-                raise ValueError(f"Conflict : {codes=}")
-            return filtered_codes[0]
-        else:
-            return codes[0]
+    @classmethod
+    def master_pattern(cls) -> MasterPattern:
+        # built once per dialect, the regex itself is compiled on the first line parsed
+        if "_master_pattern" not in cls.__dict__:
+            cls._master_pattern = MasterPattern(cls.command_set)
+        return cls._master_pattern
 
 
 class SnapmakerGcode(Gcode):
@@ -0,0 +1,37 @@
+import numpy as np
+
+from typing import Tuple
+
+
+def arc_centers(starts: np.ndarray, ends: np.ndarray, radius: np.ndarray, clockwise: np.ndarray) -> np.ndarray:
+    """XY centers of G2 (clockwise) / G3 arcs given in R form. A negative R selects the major arc."""
+    delta = ends[:, :2] - starts[:, :2]
+    chord = np.linalg.norm(delta, axis=1)
+    middle = (starts[:, :2] + ends[:, :2]) / 2
+    # the center of a clockwise minor arc lies on the right hand side of the chord
+    right_normal = np.stack([delta[:, 1], -delta[:, 0]], axis=1) / chord[:, None]
+    side = np.where(clockwise, 1.0, -1.0) * np.sign(radius)
+    height = np.sqrt(np.maximum(radius**2 - (chord / 2) ** 2, 0.0))
+    return middle + (side * height)[:, None] * right_normal
+
+
+def arc_bounds(
+    starts: np.ndarray, ends: np.ndarray, radius: np.ndarray, clockwise: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """XY bounding boxes (lows, highs) of arcs : their endpoints, and the quadrant points their sweep goes through."""
+    centers = arc_centers(starts, ends, radius, clockwise)
+    direction = np.where(clockwise, -1.0, 1.0)
+    start_angle = np.arctan2(starts[:, 1] - centers[:, 1], starts[:, 0] - centers[:, 0])
+    end_angle = np.arctan2(ends[:, 1] - centers[:, 1], ends[:, 0] - centers[:, 0])
+    sweep = np.mod(direction * (end_angle - start_angle), 2 * np.pi)
+
+    lows = np.minimum(starts[:, :2], ends[:, :2])
+    highs = np.maximum(starts[:, :2], ends[:, :2])
+    for angle, axis, side in ((0.0, 0, 1.0), (np.pi / 2, 1, 1.0), (np.pi, 0, -1.0), (-np.pi / 2, 1, -1.0)):
+        crossed = np.mod(direction * (angle - start_angle), 2 * np.pi) <= sweep
+        extreme = centers[:, axis] + side * np.abs(radius)
+        if side > 0:
+            highs[:, axis] = np.where(crossed, np.fmax(highs[:, axis], extreme), highs[:, axis])
+        else:
+            lows[:, axis] = np.where(crossed, np.fmin(lows[:, axis], extreme), lows[:, axis])
+    return lows, highs
@@ -60,3 +60,19 @@ class PreviousYStorer(PreviousValueStorer):
 
 class PreviousZStorer(PreviousValueStorer):
     last_value_container = [0.0]
+
+
+MEMORIES = [
+    PreviousXDefault,
+    PreviousYDefault,
+    PreviousZDefault,
+    PreviousFDefault,
+    PreviousXStorer,
+    PreviousYStorer,
+    PreviousZStorer,
+]
+
+
+def reset_memories():
+    for memory in MEMORIES:
+        memory.last_value_container[0] = 0.0
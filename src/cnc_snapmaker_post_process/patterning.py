@@ -1,11 +1,11 @@
-from re import Pattern, compile as re_compile
-
+import re
 from pathlib import Path
 
-from typing import Optional, Type, TYPE_CHECKING
+from typing import Dict, List, Optional, Tuple, Type, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .files import File
+    from .gcode import Command
 
 
 class _BaliseType:
@@ -15,14 +15,99 @@ class _BaliseType:
 Balise = _BaliseType()
 
 
-NAMED_GROUP_PATTERN = re_compile(r"\((\?P<.*?>)(.*?)\)")
+NAMED_GROUP_PATTERN = r"\((\?P<.*?>)(.*?)\)"
 BALISE_REPLACEMENT = r"(\1(?:\2)|(?:{.*?}))"
 
 
-def compile(pattern: str) -> Pattern:
+class Pattern:
+    """Regex with balise alternatives injected in its named groups, compiled on first use only."""
+
+    __slots__ = ("source", "_compiled")
+
+    def __init__(self, source: str):
+        self.source = source
+        self._compiled: Optional[re.Pattern[str]] = None
+
+    @property
+    def pattern(self) -> str:
+        return re.sub(NAMED_GROUP_PATTERN, BALISE_REPLACEMENT, self.source)
 
-    injected_pattern = NAMED_GROUP_PATTERN.sub(BALISE_REPLACEMENT, pattern)
-    return re_compile(injected_pattern)
+    @property
+    def compiled(self) -> re.Pattern[str]:
+        if self._compiled is None:
+            self._compiled = re.compile(self.pattern)
+        return self._compiled
+
+    def search(self, string: str) -> Optional[re.Match[str]]:
+        return self.compiled.search(string)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.source!r})"
+
+
+def compile(pattern: str) -> Pattern:
+    return Pattern(pattern)
+
+
+GROUP_NAME_PATTERN = r"\(\?P<(\w+)>"
+
+
+class MasterPattern:
+    """Single alternation regex identifying a line among a whole command set, and extracting its fields at once.
+
+    Each alternative is a command class : a conjunction of lookaheads, one per pattern of the class and of its parents,
+    so that every pattern is searched anywhere in the line just like `Command.match` does. Alternatives are ordered
+    by decreasing priority, so the first one to match has the highest priority. Group names are prefixed by the
+    alternative and pattern indices to stay unique.
+    """
+
+    def __init__(self, command_set: "List[Type[Command]]"):
+        self.classes = sorted(command_set, key=lambda command_class: -command_class.priority)
+        self.fields: List[List[Tuple[str, str]]] = []
+        self.alternatives: List[str] = []
+        for index, command_class in enumerate(self.classes):
+            fields = []
+            lookaheads = []
+            for pattern_index, pattern in enumerate(command_class.patterns()):
+                prefix = f"c{index}p{pattern_index}_"
+                fields.extend((prefix + name, name) for name in re.findall(GROUP_NAME_PATTERN, pattern.pattern))
+                source = re.sub(GROUP_NAME_PATTERN, f"(?P<{prefix}\\1>", pattern.pattern)
+                lookaheads.append(f"(?=.*?(?:{source}))")
+            self.fields.append(fields)
+            self.alternatives.append(f"(?P<c{index}>{''.join(lookaheads)})")
+        self._compiled: Optional[re.Pattern[str]] = None
+        self._conflicts: Dict[int, Optional[re.Pattern[str]]] = {}
+
+    @property
+    def compiled(self) -> re.Pattern[str]:
+        if self._compiled is None:
+            self._compiled = re.compile("|".join(self.alternatives))
+        return self._compiled
+
+    def conflicts(self, index: int) -> Optional[re.Pattern[str]]:
+        """Regex of the alternatives after `index` sharing its priority, that would be in conflict with it."""
+        if index not in self._conflicts:
+            priority = self.classes[index].priority
+            others = [
+                alternative
+                for other_index, alternative in enumerate(self.alternatives)
+                if other_index > index and self.classes[other_index].priority == priority
+            ]
+            self._conflicts[index] = re.compile("|".join(others)) if others else None
+        return self._conflicts[index]
+
+    def match(self, line: str) -> "Tuple[Type[Command], Dict[str, str | None]] | None":
+        match = self.compiled.match(line)
+        if match is None:
+            return None
+
+        index = int(match.lastgroup[1:])
+        conflicts = self.conflicts(index)
+        if conflicts is not None and (conflict := conflicts.match(line)):
+            names = [self.classes[index].__name__, self.classes[int(conflict.lastgroup[1:])].__name__]
+            raise ValueError(f"Conflict : {line=} is matched by {names}")
+
+        return self.classes[index], {name: match.group(group) for group, name in self.fields[index]}
 
 
 class Patterner:
@@ -40,4 +125,4 @@ class Patterner:
     def to_file(self, path: str | Path, file_class: "Optional[Type[File]]" = None):
         if file_class is None:
             file_class = type(self.file)
-        return file_class.from_commands(path, self.commands)
+        return file_class.from_commands(path, self.commands, quiet=self.file.quiet)
@@ -1,20 +1,33 @@
-from rich.text import Text
-from rich.console import Group
-from rich.panel import Panel
-
 from .gcode import Command
 from .files import File
 
-from typing import Dict, Type, List
+from typing import Dict, Sequence, Type, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .transformations import Rule
 
 
 class FileStatistics:
 
     classes: Dict[Type[Command], Dict[Type[Command] | None, int]]
 
-    def __init__(self, file: File):
+    def __init__(self, file: File, rules: "Sequence[Type[Rule]]" = ()):
         self.file = file
         self.classes = {}
+        self.rules = rules
+        # rule counters run across files, only the part accumulated from now on belongs to this one
+        self.initial_counters = self.read_counters()
+
+    def read_counters(self) -> Dict[str, int]:
+        counters: Dict[str, int] = {}
+        for rule in self.rules:
+            for name, value in rule.counters().items():
+                counters[name] = counters.get(name, 0) + value
+        return counters
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        return {name: value - self.initial_counters.get(name, 0) for name, value in self.read_counters().items()}
 
     def record(self, original_command: Command, transformed_command: Command | List[Command] | None):
 
@@ -35,11 +48,15 @@ class FileStatistics:
             self.classes[original_command_class] = class_statistics
 
     def print_report(self):
+        from rich.console import Group
+        from rich.panel import Panel
 
         lines = []
         for command_found, transformed_commands in self.classes.items():
             for transformed_command, count in transformed_commands.items():
                 lines.append(self.print_association(command_found, transformed_command, count))
+        for name, value in self.counters.items():
+            lines.append(self.print_counter(name, value))
         self.file.console.print(
             Panel(
                 Group(*lines),
@@ -50,6 +67,8 @@ class FileStatistics:
         )
 
     def print_association(self, command_found: Type[Command], transformed_command: Type[Command] | None, count: int):
+        from rich.text import Text
+
         plural = "s" if count > 1 else ""
         if transformed_command is not None:
             return (
@@ -69,3 +88,8 @@ class FileStatistics:
                 .append(f" {count}", style="magenta1")
                 .append(f" time{plural}")
             )
+
+    def print_counter(self, name: str, value: int):
+        from rich.text import Text
+
+        return Text(style="blue").append(f"📊 {name}").append(f" {value}", style="magenta1")
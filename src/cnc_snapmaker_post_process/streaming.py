@@ -0,0 +1,113 @@
+import socket
+from pathlib import Path
+from queue import Queue, Empty
+from threading import Thread
+from time import monotonic
+
+from .files import File
+from .transformations import TransformationRuleSet
+
+from typing import List, Optional, TextIO, Type, Union
+
+
+class StreamFilter:
+    """Transforms G-code line by line as it arrives, for use between a CAM export and a sender.
+
+    A reader thread keeps pulling lines from the input while the transformation runs, and transformed lines are
+    flushed to the output as soon as `batch_size` of them are pending, or `max_latency` seconds after the oldest one.
+    """
+
+    max_latency = 0.05
+    batch_size = 256
+
+    def __init__(
+        self,
+        file_class: Type[File],
+        transformation_class: Type[TransformationRuleSet],
+        input: TextIO,
+        output: TextIO,
+        max_latency: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        quiet: bool = False,
+    ):
+        if max_latency is not None:
+            self.max_latency = max_latency
+        if batch_size is not None:
+            self.batch_size = batch_size
+        self.input = input
+        self.output = output
+
+        # the output stream carries the G-code, reports have to go elsewhere
+        self.file = file_class(getattr(input, "name", "<stream>"), quiet=quiet)
+        if not quiet:
+            from rich.console import Console
+
+            self.file.console = Console(stderr=True)
+        self.file.commands = []
+        self.gcode = self.file.gcode_class()
+        self.transformer = transformation_class(self.file)
+
+        # None marks the end of the input, an exception a failure of the reader thread
+        self.lines: Queue[Union[str, Exception, None]] = Queue()
+        self.pending: List[str] = []
+        self.pending_since = 0.0
+
+    def read(self):
+        try:
+            for line in self.input:
+                self.lines.put(line)
+        except Exception as exception:
+            self.lines.put(exception)
+        else:
+            self.lines.put(None)
+
+    def flush(self):
+        if self.pending:
+            self.output.write("\n".join(self.pending) + "\n")
+            self.output.flush()
+            self.pending = []
+
+    def emit(self, lines: List[str]):
+        if not self.pending:
+            self.pending_since = monotonic()
+        self.pending.extend(lines)
+        if len(self.pending) >= self.batch_size or monotonic() - self.pending_since >= self.max_latency:
+            self.flush()
+
+    def process(self, line: str) -> List[str]:
+        command = self.gcode.get_code(line.rstrip("\r\n").lstrip())
+        return [transformed.generate_line() for transformed in self.transformer.transform_command(command)]
+
+    def run(self) -> "StreamFilter":
+        Thread(target=self.read, daemon=True).start()
+        try:
+            while True:
+                # never wait for input longer than what is left of the latency budget of the pending lines
+                timeout = max(self.pending_since + self.max_latency - monotonic(), 0.0) if self.pending else None
+                try:
+                    line = self.lines.get(timeout=timeout)
+                except Empty:
+                    self.flush()
+                    continue
+                if line is None:
+                    break
+                if isinstance(line, Exception):
+                    raise line
+                self.emit(self.process(line))
+        finally:
+            # what was transformed before a failure still reaches the output
+            self.flush()
+        if not self.file.quiet:
+            self.transformer.statistics.print_report()
+        return self
+
+
+def open_socket_stream(path: str) -> TextIO:
+    """Waits for a single client on the local unix socket `path` and returns its stream of lines."""
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+    connection, _ = server.accept()
+    server.close()
+    Path(path).unlink(missing_ok=True)
+    return connection.makefile("r")
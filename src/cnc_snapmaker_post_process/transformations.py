@@ -1,17 +1,22 @@
-import numpy as np
+from collections import OrderedDict
 from pathlib import Path
-from rich.text import Text
-from rich.panel import Panel
 
-from .gcode import ArcMove, LinearMove, Command
+from .gcode import ArcMove, LinearMove, Command, MoveCommand
 from .files import File
 from .stats import FileStatistics
 
-from typing import List, Type, Optional
+from math import nan
+from typing import Any, Callable, Dict, Hashable, List, Type, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class Rule:
 
+    # (n, 3) endpoints of the moves emitted by transform, for rules that compute them as arrays anyway
+    points: "Optional[np.ndarray]" = None
+
     def __init__(self, command: "Command"):
         self.command = command
 
@@ -21,6 +26,59 @@ class Rule:
     def transform(self) -> List[Command]:
         return [self.command]
 
+    @classmethod
+    def counters(cls) -> Dict[str, int]:
+        """Running totals the rule wants to appear in the statistics report."""
+        return {}
+
+
+class TemplateCache:
+    """Bounded mapping of already computed templates, evicting the least recently used one when full."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.templates: OrderedDict[Hashable, Tuple["np.ndarray", "np.ndarray"]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, build: Callable[[], Tuple["np.ndarray", "np.ndarray"]]):
+        template = self.templates.get(key)
+        if template is not None:
+            self.hits += 1
+            self.templates.move_to_end(key)
+            return template
+
+        self.misses += 1
+        template = self.templates[key] = build()
+        if len(self.templates) > self.maxsize:
+            self.templates.popitem(last=False)
+        return template
+
+
+class MovePath:
+    """Endpoints of the moves of a transformed program, along with the index of the source command of each one.
+
+    They are kept in the chunks they were produced in (a whole array per expanded arc), so that the verifier can join
+    them at once instead of reading the coordinates back from every emitted command.
+    """
+
+    def __init__(self):
+        self.sources: List[int] = []
+        self.counts: List[int] = []
+        self.ends: List[Any] = []
+        self.arcs: List[bool] = []
+
+    def add(self, source: int, ends: "np.ndarray | List[Tuple[float, float, float]]", arc: bool = False):
+        self.sources.append(source)
+        self.counts.append(len(ends))
+        self.ends.append(ends)
+        self.arcs.append(arc)
+
+    def add_move(self, source: int, move: MoveCommand):
+        # balises have no position
+        ends = [value if isinstance(value, (int, float)) else nan for value in (move.X, move.Y, move.Z)]
+        self.add(source, [tuple(ends)], isinstance(move, ArcMove))
+
 
 class TransformationRuleSet:
 
@@ -31,23 +89,48 @@ class TransformationRuleSet:
     def __init__(self, file: File):
         self.commands = file.commands
         self.file = file
-        self.statistics = FileStatistics(file)
+        self.statistics = FileStatistics(file, self.rules)
+        self.moves: Optional[MovePath] = None
+        # number of commands a rule applied to
+        self.matched = 0
 
     def transform_command(self, command: "Command") -> List[Command]:
+        return self.apply_rules(command)[0]
+
+    def apply_rules(self, command: "Command") -> "Tuple[List[Command], Optional[np.ndarray]]":
         for rule in self.rules:
             rule = rule(command)
             if rule.match():
+                self.matched += 1
                 commands = rule.transform()
                 self.statistics.record(command, commands)
-                return commands
+                return commands, rule.points
         self.statistics.record(command, None)
-        return [command]
+        return [command], None
 
     def transform(self):
         commands = []
-        for command in self.commands:
-            commands.extend(self.transform_command(command))
+        moves = MovePath()
+        for index, command in enumerate(self.commands):
+            transformed, points = self.apply_rules(command)
+            commands.extend(transformed)
+            if points is not None:
+                moves.add(index, points)
+            else:
+                for move in transformed:
+                    if isinstance(move, MoveCommand):
+                        moves.add_move(index, move)
         self.commands = commands
+        self.moves = moves
+        if not self.file.quiet:
+            self.print_transformation()
+            self.statistics.print_report()
+        return self
+
+    def print_transformation(self):
+        from rich.panel import Panel
+        from rich.text import Text
+
         self.file.console.print(
             Panel(
                 Text(style="blue")
@@ -60,19 +143,25 @@ class TransformationRuleSet:
                 highlight=True,
             )
         )
-        self.statistics.print_report()
-        return self
 
     def to_file(self, path: str | Path, file_class: Optional[Type[File]] = None):
         if file_class is None:
             file_class = type(self.file)
-        return file_class.from_commands(path, self.commands)
+        file = file_class.from_commands(path, self.commands, quiet=self.file.quiet)
+        file.moves = self.moves
+        return file
 
 
 class ArcRule(Rule):
 
     command: ArcMove
 
+    # arcs of the same radius and sweep only differ by their center, start angle and Z : their points are computed
+    # once around the origin, starting at angle 0, then rotated and translated to every such arc
+    templates = TemplateCache()
+    # radii and sweeps closer than this share a template, it absorbs the floating point noise of CAM exports
+    quantum = 1e-6
+
     def match(self):
         return True if isinstance(self.command, ArcMove) else False
 
@@ -89,17 +178,20 @@ class ArcRule(Rule):
         )
 
     def interpolate_circle(self, x, y, xe, ye, r, f, z, num_points=100):
+        import numpy as np
+
         # Calculate the center of the circle
         dx, dy = xe - x, ye - y
         q = np.sqrt(dx**2 + dy**2)
-        if q > 2 * r:
+        if q > 2 * r + ArcMove.radius_tolerance:
             raise ValueError("The points are too far apart for the given radius.")
 
         # Calculate the midpoint
         mx, my = (x + xe) / 2, (y + ye) / 2
 
         # Calculate the distance from the midpoint to the center
-        d = np.sqrt(r**2 - (q / 2) ** 2)
+        # clamped, a chord within the tolerance over the diameter gives a half circle
+        d = np.sqrt(max(r**2 - (q / 2) ** 2, 0.0))
 
         # Calculate the center of the circle (two possible centers)
         cx1 = mx - d * dy / q
@@ -121,13 +213,24 @@ class ArcRule(Rule):
         if end_angle > start_angle:
             end_angle -= 2 * np.pi
 
-        # Generate points along the arc
-        angles = np.linspace(start_angle, end_angle, num_points)
-        arc_x = cx + r * np.cos(angles)
-        arc_y = cy + r * np.sin(angles)
+        # Generate points along the arc from angle 0 around the origin, then rotate them to the start angle and
+        # translate them around the actual center
+        sweep = end_angle - start_angle
+
+        def build_template():
+            angles = np.linspace(0.0, sweep, num_points)
+            return r * np.cos(angles), r * np.sin(angles)
 
-        starts_x, starts_y = [x] + list(arc_x)[:-1], [y] + list(arc_y)[:-1]
-        ends_x, ends_y = list(arc_x), list(arc_y)
+        key = (round(r / self.quantum), round(abs(sweep) / self.quantum), 1 if sweep > 0 else -1, num_points)
+        template_x, template_y = self.templates.get(key, build_template)
+        cos, sin = np.cos(start_angle), np.sin(start_angle)
+        arc_x = cx + template_x * cos - template_y * sin
+        arc_y = cy + template_x * sin + template_y * cos
+
+        self.points = np.column_stack([arc_x, arc_y, np.full(num_points, z)])
+
+        ends_x, ends_y = arc_x.tolist(), arc_y.tolist()
+        starts_x, starts_y = [x] + ends_x[:-1], [y] + ends_y[:-1]
 
         return self.serialize_points_to_commands(starts_x, starts_y, ends_x, ends_y, f, z)
 
@@ -143,6 +246,10 @@ class ArcRule(Rule):
 
         return commands
 
+    @classmethod
+    def counters(cls) -> Dict[str, int]:
+        return {"Arc template cache hits": cls.templates.hits, "Arc template cache misses": cls.templates.misses}
+
 
 class SnapmakerTransformation(TransformationRuleSet):
 
@@ -0,0 +1,260 @@
+import numpy as np
+
+from .exceptions import ValidationException
+from .gcode import (
+    Command,
+    MoveCommand,
+    LinearMove,
+    ArcMove,
+    StartSpindleCommand,
+    StopSpindleCommand,
+    UnidentifiedCommand,
+)
+from .files import File
+from .geometry import arc_bounds
+
+from typing import Dict, List, Sequence, Tuple
+
+from math import inf
+
+
+class Violation:
+
+    def __init__(self, line_number: int, check: str, message: str, severity: str = "error"):
+        self.line_number = line_number
+        self.check = check
+        self.message = message
+        self.severity = severity
+
+    def __str__(self):
+        return f"<{self.severity}> line {self.line_number} [{self.check}] {self.message}"
+
+    def __repr__(self):
+        return str(self)
+
+    def rich_render(self):
+        from rich.text import Text
+
+        icon, style = ("❌", "red") if self.severity == "error" else ("⚠️ ", "dark_orange")
+        return Text.assemble(
+            (f"{icon} Line ", style),
+            (f"{self.line_number} ", "yellow"),
+            (f"[{self.check}] ", "dark_cyan"),
+            (self.message, style),
+        )
+
+
+class ToolpathArrays:
+    """Column view of a parsed program : one row per command, NaN where a field does not apply."""
+
+    keys = ("G", "X", "Y", "Z", "F", "R", "start_X", "start_Y", "start_Z")
+
+    def __init__(self, commands: List[Command], keys: Sequence[str] | None = None):
+        size = len(commands)
+        self.line_numbers = np.arange(1, size + 1)
+
+        # programs only use a handful of command classes : test those once instead of every command
+        classes = list(map(type, commands))
+        class_codes = {command_class: code for code, command_class in enumerate(set(classes))}
+        codes = np.fromiter(map(class_codes.__getitem__, classes), dtype=int, count=size)
+
+        def mask(command_class: type) -> np.ndarray:
+            return np.isin(codes, [code for cls, code in class_codes.items() if issubclass(cls, command_class)])
+
+        is_move = mask(MoveCommand)
+        is_linear = mask(LinearMove)
+        is_arc = mask(ArcMove)
+        self.is_unidentified = mask(UnidentifiedCommand)
+        spindle_starts = np.where(mask(StartSpindleCommand), self.line_numbers - 1, -1)
+        spindle_stops = np.where(mask(StopSpindleCommand), self.line_numbers - 1, -1)
+
+        # one comprehension per column : None (omitted or missing words) becomes NaN
+        moves = [commands[index] for index in np.flatnonzero(is_move)]
+        fields = {}
+        for key in keys or self.keys:
+            values = [getattr(move, key, None) for move in moves]
+            fields[key] = np.full(size, np.nan)
+            try:
+                fields[key][is_move] = np.array(values, dtype=float)
+            except TypeError:
+                # balises have no value
+                fields[key][is_move] = [value if isinstance(value, (int, float)) else np.nan for value in values]
+
+        self.fields = fields
+        self.is_move = is_move
+        self.is_linear = is_linear
+        self.is_arc = is_arc
+        # the spindle is on at a row if the last M3 seen is more recent than the last M5 seen
+        self.spindle_on = np.maximum.accumulate(spindle_starts) > np.maximum.accumulate(spindle_stops)
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.fields[key]
+
+
+class ToolpathValidator:
+
+    limits: Dict[str, Tuple[float, float]] = {"X": (-inf, inf), "Y": (-inf, inf), "Z": (-inf, inf)}
+    max_plunge_feed = inf
+    safe_z = -inf
+    reported_errors = 10
+    checks = [
+        "check_limits",
+        "check_feed",
+        "check_plunge_feed",
+        "check_rapid_safe_z",
+        "check_arcs",
+        "check_unidentified",
+    ]
+
+    def __init__(
+        self,
+        file: File,
+        limits: Dict[str, Tuple[float, float]] | None = None,
+        max_plunge_feed: float | None = None,
+        safe_z: float | None = None,
+    ):
+        self.file = file
+        self.limits = {**self.limits, **(limits or {})}
+        if max_plunge_feed is not None:
+            self.max_plunge_feed = max_plunge_feed
+        if safe_z is not None:
+            self.safe_z = safe_z
+        self.violations: List[Violation] = []
+
+    @property
+    def errors(self) -> List[Violation]:
+        return [violation for violation in self.violations if violation.severity == "error"]
+
+    def validate(self) -> "ToolpathValidator":
+        arrays = ToolpathArrays(self.file.commands)
+        violations = []
+        for check in self.checks:
+            violations.extend(getattr(self, check)(arrays))
+        self.violations = sorted(violations, key=lambda violation: violation.line_number)
+
+        if not self.file.quiet:
+            self.print_report()
+        if self.errors:
+            raise ValidationException(
+                f"{len(self.errors)} toolpath error(s) found in {self.file.path}",
+                [str(error) for error in self.errors],
+                self.reported_errors,
+            )
+        return self
+
+    def check_limits(self, arrays: ToolpathArrays) -> List[Violation]:
+        # arcs can bulge past their endpoints : their X / Y extents are checked instead
+        arcs = np.flatnonzero(arrays.is_arc)
+        starts = np.stack([arrays["start_" + axis][arcs] for axis in "XYZ"], axis=1)
+        ends = np.stack([arrays[axis][arcs] for axis in "XYZ"], axis=1)
+        arc_lows, arc_highs = arc_bounds(starts, ends, arrays["R"][arcs], arrays["G"][arcs] == 2)
+
+        violations = []
+        for axis, (low, high) in self.limits.items():
+            lowest, highest = arrays[axis].copy(), arrays[axis].copy()
+            if axis in "XY":
+                lowest[arcs] = arc_lows[:, "XY".index(axis)]
+                highest[arcs] = arc_highs[:, "XY".index(axis)]
+            # NaN rows (non moves) compare False on both sides, so they never trigger
+            for index in np.flatnonzero((lowest < low) | (highest > high)):
+                value = lowest[index] if lowest[index] < low else highest[index]
+                violations.append(
+                    Violation(
+                        int(arrays.line_numbers[index]),
+                        "limits",
+                        f"{axis}{value:g} is outside of the work envelope [{low:g}, {high:g}]",
+                    )
+                )
+        return violations
+
+    def check_feed(self, arrays: ToolpathArrays) -> List[Violation]:
+        # the feed rate is modal and starts at 0 : a cutting move before the first F word would not move at all
+        return [
+            Violation(int(arrays.line_numbers[index]), "feed", f"G{arrays['G'][index]:g} move without a feed rate")
+            for index in np.flatnonzero((arrays["G"] >= 1) & (arrays["F"] <= 0))
+        ]
+
+    def check_plunge_feed(self, arrays: ToolpathArrays) -> List[Violation]:
+        feed = arrays["F"]
+        plunging = (arrays["G"] >= 1) & (arrays["Z"] < arrays["start_Z"])
+        return [
+            Violation(
+                int(arrays.line_numbers[index]),
+                "plunge feed",
+                f"Z-down move at F{feed[index]:g} exceeds the maximal plunge feed of F{self.max_plunge_feed:g}",
+            )
+            for index in np.flatnonzero(plunging & (feed > self.max_plunge_feed))
+        ]
+
+    def check_rapid_safe_z(self, arrays: ToolpathArrays) -> List[Violation]:
+        rapids = arrays.is_linear & (arrays["G"] == 0) & arrays.spindle_on
+        # a pure Z retract starting below the safe Z is fine, ending there or moving in XY is not
+        moves_xy = (arrays["X"] != arrays["start_X"]) | (arrays["Y"] != arrays["start_Y"])
+        too_low = (arrays["Z"] < self.safe_z) | (moves_xy & (arrays["start_Z"] < self.safe_z))
+        lowest_z = np.fmin(arrays["Z"], arrays["start_Z"])
+        return [
+            Violation(
+                int(arrays.line_numbers[index]),
+                "rapid below safe Z",
+                f"G0 move at Z{lowest_z[index]:g} with the spindle on, below the safe Z{self.safe_z:g}",
+            )
+            for index in np.flatnonzero(rapids & too_low)
+        ]
+
+    def check_arcs(self, arrays: ToolpathArrays) -> List[Violation]:
+        radius = arrays["R"]
+        chord = np.hypot(arrays["X"] - arrays["start_X"], arrays["Y"] - arrays["start_Y"])
+        # mirrors the geometric requirements of ArcRule.interpolate_circle
+        too_far = chord > 2 * radius + ArcMove.radius_tolerance
+        invalid = arrays.is_arc & ((radius <= 0) | (chord == 0) | too_far)
+        return [
+            Violation(
+                int(arrays.line_numbers[index]),
+                "arc radius",
+                f"R{radius[index]:g} is inconsistent with a chord of {chord[index]:.4f} between its endpoints",
+            )
+            for index in np.flatnonzero(invalid)
+        ]
+
+    def check_unidentified(self, arrays: ToolpathArrays) -> List[Violation]:
+        return [
+            Violation(
+                int(arrays.line_numbers[index]),
+                "unidentified",
+                f'"{self.file.commands[index].line}" will be passed through untouched',
+                severity="warning",
+            )
+            for index in np.flatnonzero(arrays.is_unidentified)
+        ]
+
+    def print_report(self):
+        from rich.console import Group
+        from rich.panel import Panel
+        from rich.text import Text
+
+        if self.violations:
+            lines = [violation.rich_render() for violation in self.violations]
+        else:
+            lines = [Text("✅ No violation found", style="chartreuse1")]
+        errors = len(self.errors)
+        self.file.console.print(
+            Panel(
+                Group(
+                    Text(style="blue")
+                    .append("🔎 Validated toolpath of file ")
+                    .append(f"{self.file.path}", style="light_salmon3")
+                    .append(f" : {errors} error(s), {len(self.violations) - errors} warning(s)"),
+                    *lines,
+                ),
+                title="Validating",
+                border_style="red bold" if errors else "blue bold",
+                title_align="left",
+                highlight=True,
+            )
+        )
+
+
+class SnapmakerValidator(ToolpathValidator):
+
+    max_plunge_feed = 300
+    safe_z = 0.0
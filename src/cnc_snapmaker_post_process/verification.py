@@ -0,0 +1,224 @@
+import numpy as np
+
+from .exceptions import VerificationException
+from .files import File
+from .gcode import LinearMove
+from .geometry import arc_centers
+from .validation import ToolpathArrays
+
+from typing import List, Tuple
+
+
+def point_to_segment_distance(points: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Distance of each (n, 3) point to the segment of the same row."""
+    direction = ends - starts
+    squared_length = np.einsum("ij,ij->i", direction, direction)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = np.einsum("ij,ij->i", points - starts, direction) / squared_length
+    t = np.clip(np.nan_to_num(t), 0.0, 1.0)
+    return np.linalg.norm(points - (starts + t[:, None] * direction), axis=1)
+
+
+def point_to_arc_distance(
+    points: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    radius: np.ndarray,
+    clockwise: np.ndarray,
+    arcs: np.ndarray | None = None,
+) -> np.ndarray:
+    """Distance of each (n, 3) point to the arc of the same row. Z is interpolated along the sweep (helical arcs).
+
+    With `arcs`, the arcs are given once each and `arcs` holds the index of the arc of every point : the geometry of
+    an arc is then computed once for all of its points.
+    """
+    centers = arc_centers(starts, ends, radius, clockwise)
+    direction = np.where(clockwise, -1.0, 1.0)
+
+    def angle_of(xy: np.ndarray) -> np.ndarray:
+        return np.arctan2(xy[:, 1] - centers[:, 1], xy[:, 0] - centers[:, 0])
+
+    start_angle = angle_of(starts)
+    # angles are measured from the start, in the travel direction of the arc
+    sweep = np.mod(direction * (angle_of(ends) - start_angle), 2 * np.pi)
+    if arcs is not None:
+        starts, ends, radius, centers = starts[arcs], ends[arcs], radius[arcs], centers[arcs]
+        direction, start_angle, sweep = direction[arcs], start_angle[arcs], sweep[arcs]
+    relative = np.mod(direction * (angle_of(points) - start_angle), 2 * np.pi)
+
+    within = relative <= sweep
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = np.nan_to_num(relative / sweep)
+    arc_z = starts[:, 2] + t * (ends[:, 2] - starts[:, 2])
+    radial = np.hypot(points[:, 0] - centers[:, 0], points[:, 1] - centers[:, 1]) - np.abs(radius)
+    on_arc = np.hypot(radial, points[:, 2] - arc_z)
+
+    to_endpoints = np.minimum(np.linalg.norm(points - starts, axis=1), np.linalg.norm(points - ends, axis=1))
+    return np.where(within, on_arc, to_endpoints)
+
+
+class DeviationVerifier:
+
+    tolerance = 0.05
+    match_tolerance = 0.01
+    search_window = 256
+    reported_lines = 10
+
+    def __init__(self, original: File, transformed: File, tolerance: float | None = None):
+        self.original = original
+        self.transformed = transformed
+        if tolerance is not None:
+            self.tolerance = tolerance
+        self.max_deviation = 0.0
+        self.rms_deviation = 0.0
+        self.worst_lines: List[Tuple[int, float]] = []
+
+    @staticmethod
+    def endpoints(arrays: ToolpathArrays, indices: np.ndarray, prefix: str = "") -> np.ndarray:
+        return np.stack([arrays[prefix + axis][indices] for axis in "XYZ"], axis=1)
+
+    def map_segments(self, source_ends: np.ndarray, output_ends: np.ndarray) -> np.ndarray:
+        """Index of the source move of every output segment, for outputs that don't record their sources.
+
+        Each source move is closed by the last output segment landing on its endpoint before the segments of the
+        next source move. Searching backward from the end of the output keeps segments that land on the same point
+        several times in a row (small arcs, rounding) with the last source they can belong to.
+        """
+        closes = np.empty(len(source_ends), dtype=int)
+        end = len(output_ends)
+        for source in reversed(range(len(source_ends))):
+            window = self.search_window
+            while True:
+                start = max(end - window, 0)
+                hits = np.flatnonzero(
+                    np.all(np.abs(output_ends[start:end] - source_ends[source]) <= self.match_tolerance, axis=1)
+                )
+                if len(hits) or start == 0:
+                    break
+                window *= 2
+            if not len(hits):
+                raise VerificationException(
+                    f"Could not find the endpoint {source_ends[source].tolist()} of the source move n°{source} "
+                    "in the transformed output"
+                )
+            end = closes[source] = start + hits[-1]
+            if source == len(source_ends) - 1 and end != len(output_ends) - 1:
+                raise VerificationException(
+                    f"{len(output_ends) - 1 - end} transformed move(s) have no source command"
+                )
+
+        return np.repeat(np.arange(len(source_ends)), np.diff(closes, prepend=-1))
+
+    def recorded_segments(self, source_rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Source move, endpoint and arc flag of every output segment, from what the transformation recorded."""
+        path = self.transformed.moves
+        counts = np.asarray(path.counts, dtype=int)
+        chunks = [np.asarray(chunk, dtype=float).reshape(-1, 3) for chunk in path.ends]
+        ends = np.concatenate(chunks) if chunks else np.empty((0, 3))
+        is_arc = np.repeat(np.asarray(path.arcs, dtype=bool), counts)
+        # rounded like generate_line writes the linear moves
+        ends[~is_arc] = np.round(ends[~is_arc], LinearMove.decimals)
+
+        sources = np.repeat(np.asarray(path.sources, dtype=int), counts)
+        moves = np.searchsorted(source_rows, sources)
+        if np.any(source_rows[np.minimum(moves, len(source_rows) - 1)] != sources):
+            raise VerificationException("Some transformed moves don't come from a source move")
+        return moves, ends, is_arc
+
+    def parsed_segments(
+        self, source: ToolpathArrays, source_rows: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Source move, endpoint and arc flag of every output segment, from the written output."""
+        output = ToolpathArrays(self.transformed.parse_commands().commands, keys=("X", "Y", "Z"))
+        output_rows = np.flatnonzero(output.is_move)
+        ends = self.endpoints(output, output_rows)
+        return self.map_segments(self.endpoints(source, source_rows), ends), ends, output.is_arc[output_rows]
+
+    def verify(self) -> "DeviationVerifier":
+        source = ToolpathArrays(self.original.commands)
+        source_rows = np.flatnonzero(source.is_move)
+        if self.transformed.moves is not None:
+            moves, segment_ends, segment_is_arc = self.recorded_segments(source_rows)
+        else:
+            moves, segment_ends, segment_is_arc = self.parsed_segments(source, source_rows)
+        # a segment starts where the previous one ended, the first one where its source move starts
+        first_start = self.endpoints(source, source_rows[moves[:1]], "start_")
+        segment_starts = np.concatenate([first_start, segment_ends[:-1]])
+
+        # chords deviate the most at their middle, straight lines at their ends : sample both
+        middles = np.where(segment_is_arc[:, None], segment_ends, (segment_starts + segment_ends) / 2)
+        points = np.concatenate([segment_starts, middles, segment_ends])
+        moves = np.tile(moves, 3)
+        rows = source_rows[moves]
+
+        is_arc = source.is_arc[rows]
+        deviations = np.empty(len(points))
+        deviations[~is_arc] = point_to_segment_distance(
+            points[~is_arc], self.endpoints(source, rows[~is_arc], "start_"), self.endpoints(source, rows[~is_arc])
+        )
+        # the geometry of each source arc is computed once, for all the points of its segments
+        arc_rows = source_rows[source.is_arc[source_rows]]
+        arc_of_move = np.cumsum(source.is_arc[source_rows]) - 1
+        deviations[is_arc] = point_to_arc_distance(
+            points[is_arc],
+            self.endpoints(source, arc_rows, "start_"),
+            self.endpoints(source, arc_rows),
+            source["R"][arc_rows],
+            source["G"][arc_rows] == 2,
+            arcs=arc_of_move[moves[is_arc]],
+        )
+
+        if len(deviations):
+            self.max_deviation = float(deviations.max())
+            self.rms_deviation = float(np.sqrt(np.mean(deviations**2)))
+            worst = np.zeros(len(source_rows))
+            np.maximum.at(worst, moves, deviations)
+            order = np.argsort(worst)[::-1][: self.reported_lines]
+            self.worst_lines = [
+                (int(source.line_numbers[source_rows[i]]), float(worst[i])) for i in order if worst[i] > self.tolerance
+            ]
+
+        if not self.original.quiet:
+            self.print_report()
+        if self.max_deviation > self.tolerance:
+            raise VerificationException(
+                f"Maximal deviation of {self.max_deviation:.4f} exceeds the tolerance of {self.tolerance:g}",
+                [f"line {line_number} deviates by {deviation:.4f}" for line_number, deviation in self.worst_lines],
+            )
+        return self
+
+    def print_report(self):
+        from rich.console import Group
+        from rich.panel import Panel
+        from rich.text import Text
+
+        failed = self.max_deviation > self.tolerance
+        lines = [
+            Text(style="blue")
+            .append("📐 Compared ")
+            .append(f"{self.transformed.path}", style="light_salmon3")
+            .append(" against ")
+            .append(f"{self.original.path}", style="light_salmon3"),
+            Text(style="red" if failed else "chartreuse1")
+            .append("Max deviation ")
+            .append(f"{self.max_deviation:.4f}", style="magenta1")
+            .append(" , RMS deviation ")
+            .append(f"{self.rms_deviation:.4f}", style="magenta1")
+            .append(f" (tolerance {self.tolerance:g})"),
+        ] + [
+            Text.assemble(("❌ Line ", "red"), (f"{line_number} ", "yellow"), (f"deviates by {deviation:.4f}", "red"))
+            for line_number, deviation in self.worst_lines
+        ]
+        self.original.console.print(
+            Panel(
+                Group(*lines),
+                title="Verifying",
+                border_style="red bold" if failed else "blue bold",
+                title_align="left",
+                highlight=True,
+            )
+        )
+
+
+class SnapmakerVerifier(DeviationVerifier):
+    pass
@@ -0,0 +1,15 @@
+import pytest
+
+from cnc_snapmaker_post_process.files import SnapmakerFile
+
+
+@pytest.fixture
+def parse(tmp_path):
+    """Writes the given lines to a program in the test directory, then reads and parses it."""
+
+    def parse(*lines: str, name: str = "program.cnc", compact: bool = False) -> SnapmakerFile:
+        path = tmp_path / name
+        path.write_text("\n".join(lines) + "\n")
+        return SnapmakerFile(path, compact=compact, quiet=True).read_content().parse_commands()
+
+    return parse
@@ -0,0 +1,48 @@
+import pytest
+
+from cnc_snapmaker_post_process.gcode import ArcMove, LinearMove, SnapmakerGcode, UnidentifiedCommand
+from cnc_snapmaker_post_process.patterning import Balise
+
+
+def test_compact_commands_regenerate_their_line():
+    gcode = SnapmakerGcode(compact=True)
+    move, arc, balise, unidentified = [
+        gcode.get_code(line) for line in ["G1 X1 F100 Y2 Z3", "G2 X10 Y0 R5 F100", "G1 X{a}", "G4 P1"]
+    ]
+    assert move._line is None and move.line == "G1 X1.00 Y2.00 Z3.00 F100"
+    assert arc._line is None and arc.line == "G2 X10.0 Y0.0 Z3.0 R5.0 F100.0"
+    # lines that can't be generated back are kept
+    assert balise.line == "G1 X{a}"
+    assert type(unidentified) is UnidentifiedCommand and unidentified.line == "G4 P1"
+
+
+def test_commands_keep_their_line_by_default():
+    assert SnapmakerGcode().get_code("G1 X1 F100").line == "G1 X1 F100"
+
+
+def test_str_lists_the_declared_fields():
+    command = SnapmakerGcode().get_code("G2 X10 Y0 R5 F100")
+    assert str(command) == (
+        "<ArcMove> G=2, X=10.0, Y=0.0, Z=0.0, F=100.0, start_X=0.0, start_Y=0.0, start_Z=0.0, R=5.0"
+    )
+
+
+def test_contains_a_balise_is_computed_from_the_fields():
+    command = SnapmakerGcode().get_code("G1 X1 Y2 F100")
+    assert not command.contains_a_balise
+    command.Y = Balise
+    assert command.contains_a_balise
+
+
+def test_manual_instanciation():
+    move = LinearMove.manual_instanciation(G=1, X=1, Y=2, Z=-1, F=100)
+    assert move.generate_line() == "G1 X1.00 Y2.00 Z-1.00 F100"
+    with pytest.raises(TypeError, match=r"ArcMove has no field \['Q'\]"):
+        ArcMove.manual_instanciation(G=2, Q=1)
+
+
+def test_compact_file_writes_back_every_line(parse, tmp_path):
+    file = parse("G90", "G0 X0 Y0 Z5", "G1 X1 F100 Z-1", "G4 P1", compact=True)
+    file.path = tmp_path / "written.cnc"
+    file.write_content()
+    assert file.path.read_text().splitlines() == ["G90", "G0 X0.00 Y0.00 Z5.00", "G1 X1.00 Y0.00 Z-1.00 F100", "G4 P1"]
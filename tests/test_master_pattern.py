@@ -0,0 +1,86 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from cnc_snapmaker_post_process.gcode import (
+    ArcMove,
+    CommentLine,
+    LinearMove,
+    SnapmakerGcode,
+    UnidentifiedCommand,
+)
+from cnc_snapmaker_post_process.memories import reset_memories
+from cnc_snapmaker_post_process.patterning import Balise
+
+PROGRAM = Path(__file__).resolve().parent.parent / "test.cnc"
+TOKENS = ["G0", "G1", "G2", "G3", "X1", "Y-2", "Z.5", "F100", "R3", "X{a}", "R{b}", "M3", "P5", "M5", "G21", "G90", "#"]
+
+
+def reference_identify(line):
+    """Identification class by class, through `Command.match`, as it was done before the master pattern."""
+    codes = []
+    for command_class in SnapmakerGcode.command_set:
+        reset_memories()
+        if (code := command_class.parse_line(line)) is not None:
+            codes.append(code)
+    if not codes:
+        return UnidentifiedCommand(line)
+    max_priority = max(code.priority for code in codes)
+    codes = [code for code in codes if code.priority >= max_priority]
+    if len(codes) > 1:
+        raise ValueError(f"Conflict : {codes=}")
+    return codes[0]
+
+
+def identify(line):
+    reset_memories()
+    return SnapmakerGcode().identify(line)
+
+
+def described(command):
+    return type(command), {field: getattr(command, field, None) for field in command.fields}
+
+
+def lines():
+    random.seed(0)
+    program = [line.lstrip() for line in PROGRAM.read_text().splitlines() if line.strip()]
+    generated = [" ".join(random.choices(TOKENS, k=random.randint(1, 5))) for _ in range(2000)]
+    return program + generated
+
+
+def test_identifies_like_the_per_class_matching():
+    for line in lines():
+        try:
+            expected = described(reference_identify(line))
+        except ValueError:
+            with pytest.raises(ValueError):
+                identify(line)
+            continue
+        assert described(identify(line)) == expected, line
+
+
+def test_balises_are_extracted():
+    command = identify("G2 X{a} Y1 R{radius}")
+    assert type(command) is ArcMove
+    assert command.X is Balise and command.R is Balise and command.Y == 1
+    assert described(command) == described(reference_identify("G2 X{a} Y1 R{radius}"))
+
+
+def test_higher_priority_wins():
+    assert type(identify("# G1 X5")) is CommentLine
+    assert type(identify("G1 X5")) is LinearMove
+
+
+def test_equal_priorities_conflict():
+    with pytest.raises(ValueError, match="Conflict"):
+        identify("M3 P10 G1 X2")
+    with pytest.raises(ValueError, match="Conflict"):
+        reference_identify("M3 P10 G1 X2")
+
+
+@pytest.mark.parametrize("line", ["foo", "G2 X1", "G4 P1"])
+def test_unmatched_lines_are_unidentified(line):
+    command = identify(line)
+    assert type(command) is UnidentifiedCommand
+    assert command.line == line
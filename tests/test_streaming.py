@@ -0,0 +1,35 @@
+import io
+
+import pytest
+
+from cnc_snapmaker_post_process.files import SnapmakerFile
+from cnc_snapmaker_post_process.streaming import StreamFilter
+from cnc_snapmaker_post_process.transformations import SnapmakerTransformation
+
+
+def failing_input(*lines):
+    yield from lines
+    raise OSError("connection reset")
+
+
+def stream(input, **kwargs):
+    return StreamFilter(SnapmakerFile, SnapmakerTransformation, input, io.StringIO(), quiet=True, **kwargs)
+
+
+def test_transforms_every_line():
+    stream_filter = stream(io.StringIO("G0 X0 Y0 Z5\nG1 X10 F100\n")).run()
+    assert stream_filter.output.getvalue() == "G0 X0.00 Y0.00 Z5.00\nG1 X10.00 Y0.00 Z5.00 F100\n"
+
+
+def test_reader_errors_reach_the_caller_after_flushing():
+    stream_filter = stream(failing_input("G0 X0 Y0 Z5\n"), batch_size=10, max_latency=10)
+    with pytest.raises(OSError, match="connection reset"):
+        stream_filter.run()
+    assert stream_filter.output.getvalue() == "G0 X0.00 Y0.00 Z5.00\n"
+
+
+def test_pending_lines_are_flushed_when_processing_fails():
+    stream_filter = stream(io.StringIO("G0 X0 Y0 Z5\nG2 X10 Y0 R1\n"), batch_size=10, max_latency=10)
+    with pytest.raises(ValueError, match="too far apart"):
+        stream_filter.run()
+    assert stream_filter.output.getvalue() == "G0 X0.00 Y0.00 Z5.00\n"
@@ -0,0 +1,54 @@
+from cnc_snapmaker_post_process.transformations import ArcRule, SnapmakerTransformation, TemplateCache
+
+
+def transform(file):
+    return file.to_tranformer(SnapmakerTransformation).transform()
+
+
+def written(transformer):
+    return [command.generate_line() for command in transformer.commands]
+
+
+# the same arc twice, around another center and at another depth : the second one reuses the template of the first
+REPEATED_ARC = ("G0 X0 Y0 Z0", "G2 X10 Y0 R5 F100", "G0 X20 Y5 Z-1", "G2 X30 Y5 R5 F100")
+
+
+def test_least_recently_used_template_is_evicted():
+    cache = TemplateCache(maxsize=2)
+    built = []
+
+    def build(key):
+        return lambda: built.append(key) or key
+
+    for key in ["a", "b", "a", "c", "a", "b"]:
+        assert cache.get(key, build(key)) == key
+    # "b" was the least recently used when "c" came in, "a" was kept
+    assert built == ["a", "b", "c", "b"]
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert list(cache.templates) == ["a", "b"]
+
+
+def test_statistics_count_this_file_only(parse, monkeypatch):
+    monkeypatch.setattr(ArcRule, "templates", TemplateCache())
+    transform(parse(*REPEATED_ARC))
+    statistics = transform(parse(*REPEATED_ARC)).statistics
+    assert statistics.counters == {"Arc template cache hits": 2, "Arc template cache misses": 0}
+
+
+def test_arcs_share_templates_whatever_their_start_angle(parse, monkeypatch):
+    monkeypatch.setattr(ArcRule, "templates", TemplateCache())
+    # the four quarters of a circle, the last one with a radius off by some floating point noise
+    quarters = ["G2 X0 Y-5 R5", "G2 X-5 Y0 R5", "G2 X0 Y5 R5", "G2 X5 Y0 R5.0000000001"]
+    transform(parse("G0 X5 Y0 Z0", "G1 F100", *quarters))
+    assert (ArcRule.templates.hits, ArcRule.templates.misses) == (3, 1)
+
+
+def test_cached_templates_give_the_same_output(parse, monkeypatch):
+    monkeypatch.setattr(ArcRule, "templates", TemplateCache())
+    cached = written(transform(parse(*REPEATED_ARC)))
+    assert (ArcRule.templates.hits, ArcRule.templates.misses) == (1, 1)
+
+    monkeypatch.setattr(ArcRule, "templates", TemplateCache(maxsize=0))
+    uncached = written(transform(parse(*REPEATED_ARC)))
+    assert ArcRule.templates.hits == 0
+    assert cached == uncached
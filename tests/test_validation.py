@@ -0,0 +1,80 @@
+import pytest
+
+from cnc_snapmaker_post_process.exceptions import ValidationException
+from cnc_snapmaker_post_process.transformations import SnapmakerTransformation
+from cnc_snapmaker_post_process.validation import SnapmakerValidator
+
+
+def violations(file, **kwargs):
+    validator = file.to_validator(SnapmakerValidator, **kwargs)
+    try:
+        validator.validate()
+    except ValidationException:
+        assert validator.errors
+    return validator.violations
+
+
+def test_clean_program_only_warns_on_unidentified(parse):
+    file = parse("; comment", "G90", "G0 X0 Y0 Z5", "M3 P100", "G1 Z-1 F100", "G2 X5 Y0 R2.5", "M5")
+    assert [(violation.line_number, violation.check) for violation in violations(file)] == [(1, "unidentified")]
+
+
+def test_collects_every_violation_with_line_numbers(parse):
+    file = parse(
+        "G0 X0 Y0 Z5",
+        "M3 P100",
+        "G1 Z-1 F1000",
+        "G0 X3",
+        "G2 X10 Y0 R2",
+        "G1 X50",
+    )
+    found = [(violation.line_number, violation.check) for violation in violations(file, limits={"X": (-20, 20)})]
+    assert found == [(3, "plunge feed"), (4, "rapid below safe Z"), (5, "arc radius"), (6, "limits")]
+
+
+def test_rapid_retract_from_below_safe_z_is_allowed(parse):
+    file = parse("G0 X0 Y0 Z5", "M3 P100", "G1 Z-1 F100", "G0 Z10", "M5")
+    assert violations(file) == []
+
+
+def test_arc_bulging_past_the_envelope(parse):
+    file = parse("G0 X0 Y0 Z5", "G2 X10 Y0 R5 F100")
+    found = violations(file, limits={"Y": (-1, 1)})
+    assert [(violation.line_number, violation.check) for violation in found] == [(2, "limits")]
+    assert "Y5" in found[0].message
+
+
+def test_arc_within_radius_tolerance_validates_and_transforms(parse):
+    file = parse("G0 X0 Y0 Z5", "G1 Z-1 F100", "G2 X5.0005 Y0 R2.5")
+    assert violations(file) == []
+    file.to_tranformer(SnapmakerTransformation).transform()
+
+
+def test_arc_beyond_radius_tolerance_is_reported(parse):
+    file = parse("G0 X0 Y0 Z5", "G2 X5.01 Y0 R2.5 F100")
+    assert [violation.check for violation in violations(file)] == ["arc radius"]
+
+
+def test_move_words_in_any_order(parse):
+    file = parse("G0 Z5 X1", "G1 X2 F100 Z-1", "G2 F200 R1 Y0 X4")
+    assert [(move.X, move.Y, move.Z, move.F) for move in file.commands] == [
+        (1, 0, 5, 0),
+        (2, 0, -1, 100),
+        (4, 0, -1, 200),
+    ]
+    assert file.commands[2].R == 1
+
+
+def test_feed_moves_without_feed_rate(parse):
+    file = parse("G0 X0 Y0 Z5", "G1 X10", "G1 X20 F100", "G2 X30 Y0 R5")
+    assert [(violation.line_number, violation.check) for violation in violations(file)] == [(2, "feed")]
+
+
+def test_errors_are_listed_in_the_exception(parse):
+    file = parse(*[f"G1 X{50 + index} F100" for index in range(12)])
+    with pytest.raises(ValidationException) as error:
+        file.to_validator(SnapmakerValidator, limits={"X": (-20, 20)}).validate()
+    message = str(error.value).splitlines()
+    assert message[0].startswith("12 toolpath error(s) found in ")
+    assert message[1] == "<error> line 1 [limits] X50 is outside of the work envelope [-20, 20]"
+    assert message[-1] == "... and 2 more"
@@ -0,0 +1,48 @@
+import pytest
+
+from cnc_snapmaker_post_process.exceptions import VerificationException
+from cnc_snapmaker_post_process.files import SnapmakerFile
+from cnc_snapmaker_post_process.transformations import SnapmakerTransformation
+from cnc_snapmaker_post_process.verification import SnapmakerVerifier
+
+
+def transform(file, tmp_path):
+    return file.to_tranformer(SnapmakerTransformation).transform().to_file(tmp_path / "output.cnc").write_content()
+
+
+# the last line is written at the very same point as the end of the small arc before it
+SMALL_ARC = ("G0 X0 Y0 Z0", "G1 X0.3 F100", "G2 X0 Y-0.3 R0.3", "G1 X0 Y-0.305")
+
+
+def test_small_arc_followed_by_a_close_move(parse, tmp_path):
+    file = parse(*SMALL_ARC)
+    verifier = file.to_verifier(SnapmakerVerifier, transform(file, tmp_path)).verify()
+    assert verifier.max_deviation < verifier.tolerance
+
+
+def test_small_arc_followed_by_a_close_move_read_back(parse, tmp_path):
+    file = parse(*SMALL_ARC)
+    transform(file, tmp_path)
+    # read from disk, the output has no record of the source of its commands
+    output = SnapmakerFile(tmp_path / "output.cnc", quiet=True).read_content()
+    verifier = file.to_verifier(SnapmakerVerifier, output).verify()
+    assert verifier.max_deviation < verifier.tolerance
+
+
+def test_reports_deviating_lines(parse):
+    file = parse("G0 X0 Y0 Z0", "G1 X10 F100", "G1 X10 Y10")
+    output = parse("G0 X0 Y0 Z0", "G1 X5 Y1 F100", "G1 X10 Y0", "G1 X10 Y10", name="output.cnc")
+    verifier = file.to_verifier(SnapmakerVerifier, output)
+    with pytest.raises(VerificationException, match="line 2 deviates by 1.0000"):
+        verifier.verify()
+    assert verifier.max_deviation == pytest.approx(1)
+    assert [line_number for line_number, _ in verifier.worst_lines] == [2]
+
+
+def test_detects_arcs_swept_the_wrong_way(parse, tmp_path):
+    clockwise = parse("G0 X0 Y0 Z0", "G2 X10 Y0 R5 F100", name="clockwise.cnc")
+    counterclockwise = parse("G0 X0 Y0 Z0", "G3 X10 Y0 R5 F100", name="counterclockwise.cnc")
+    output = transform(clockwise, tmp_path)
+    assert clockwise.to_verifier(SnapmakerVerifier, output).verify().max_deviation < 0.05
+    with pytest.raises(VerificationException):
+        counterclockwise.to_verifier(SnapmakerVerifier, output).verify()